@@ -0,0 +1,49 @@
+import atexit
+import threading
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+import httpx
+
+HTTP_TIMEOUT = 60.0
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+_async_client: ContextVar[Optional[httpx.AsyncClient]] = ContextVar("_async_client", default=None)
+
+
+def sync_client() -> httpx.Client:
+    """Process-wide HTTP/2 keep-alive client for blocking API calls.
+
+    Opened on first use and closed at exit, so OpenAI embedding calls and
+    LiteLLM's OpenAI-compatible LLM calls reuse warm TLS connections.
+    """
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None:
+            _sync_client = httpx.Client(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+            atexit.register(_sync_client.close)
+        return _sync_client
+
+
+@asynccontextmanager
+async def async_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Share one HTTP/2 keep-alive AsyncClient with everything inside the block.
+
+    Async connections belong to the event loop that opened them, and the
+    pipeline runs several short asyncio.run loops, so the client lives for a
+    block rather than the process. Nested blocks, including those in tasks
+    started inside it, reuse the outer client.
+    """
+    client = _async_client.get()
+    if client is not None:
+        yield client
+        return
+
+    async with httpx.AsyncClient(http2=True, timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS) as client:
+        token = _async_client.set(client)
+        try:
+            yield client
+        finally:
+            _async_client.reset(token)
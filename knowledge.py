@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+import fitz  # PyMuPDF
+import pymupdf4llm
+from openai import OpenAI
+from crewai.knowledge.source.base_knowledge_source import BaseKnowledgeSource
+from pydantic import Field, PrivateAttr
+from http_clients import sync_client
+
+KNOWLEDGE_DIR = "knowledge"
+KB_CACHE_DIR = "outputs/.kb_cache"
+MAX_EMBEDDING_INPUTS = 2048  # OpenAI limit on inputs per embeddings request
+MAX_INLINE_TOKENS = 100_000  # Longer papers fall back to retrieval
+
+
+class CachedPDFKnowledgeSource(BaseKnowledgeSource):
+    """PDF knowledge source that parses and embeds each file only once.
+
+    The extracted chunks and their embeddings are stored under the hash of
+    the PDF and the chunking and embedding settings, so later runs on the
+    same file load them from disk and hand
+    ready-made vectors to the crew's knowledge store. The whole paper is also
+    available as Markdown for prompts, which is preferred whenever it fits.
+    """
+
+    file_path: str = Field(..., description="PDF path, absolute or relative to the knowledge directory")
+    cache_dir: str = Field(default=KB_CACHE_DIR)
+    embedding_model: str = Field(default="text-embedding-3-small")
+    chunk_size: int = 1500
+    chunk_overlap: int = 150
+    _markdown: Optional[str] = PrivateAttr(default=None)
+
+    @property
+    def resolved_path(self) -> str:
+        """Match PDFKnowledgeSource, which looks in the knowledge directory first."""
+        candidate = os.path.join(KNOWLEDGE_DIR, self.file_path)
+        return candidate if os.path.exists(candidate) else self.file_path
+
+    def validate_content(self) -> str:
+        path = self.resolved_path
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Research paper not found: {path}")
+        return path
+
+    def content_hash(self) -> str:
+        """Hash the PDF bytes so edits to the paper invalidate the cache."""
+        with open(self.validate_content(), "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def extract_text(self) -> str:
+        """Extract plain text from every page of the PDF."""
+        with fitz.open(self.validate_content()) as document:
+            return "\n".join(page.get_text() for page in document)
+
+    def _write_cache(self, cache_file: str, content: str) -> None:
+        """Write a cache file atomically so an interrupted run leaves no partial entry."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_file, cache_file)
+
+    def markdown(self) -> str:
+        """Return the whole paper as Markdown, converting it on the first call."""
+        if self._markdown is None:
+            cache_file = os.path.join(self.cache_dir, f"{self.content_hash()}.md")
+            if os.path.exists(cache_file):
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    self._markdown = f.read()
+            else:
+                self._markdown = pymupdf4llm.to_markdown(self.validate_content())
+                self._write_cache(cache_file, self._markdown)
+        return self._markdown
+
+    def fits_in_context(self, max_tokens: int = MAX_INLINE_TOKENS) -> bool:
+        """Whether the whole paper can go in the prompt, at roughly four characters per token."""
+        return len(self.markdown()) // 4 <= max_tokens
+
+    def embed(self, chunks: List[str]) -> List[List[float]]:
+        """Embed all chunks in as few requests as the API allows."""
+        client = OpenAI(http_client=sync_client())
+        embeddings = []
+        for start in range(0, len(chunks), MAX_EMBEDDING_INPUTS):
+            response = client.embeddings.create(
+                model=self.embedding_model,
+                input=chunks[start:start + MAX_EMBEDDING_INPUTS],
+            )
+            embeddings.extend(item.embedding for item in response.data)
+        return embeddings
+
+    def load(self) -> Dict:
+        """Return the cached chunks and embeddings, building them on a miss."""
+        content_hash = self.content_hash()
+        # Chunking and embedding settings change the vectors, so they are part of the key
+        cache_file = os.path.join(
+            self.cache_dir,
+            f"{content_hash}-{self.embedding_model}-{self.chunk_size}-{self.chunk_overlap}.json",
+        )
+
+        if os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        chunks = self._chunk_text(self.extract_text())
+        blob = {
+            "hash": content_hash,
+            "model": self.embedding_model,
+            "chunks": chunks,
+            "embeddings": self.embed(chunks),
+        }
+        self._write_cache(cache_file, json.dumps(blob))
+        return blob
+
+    def add(self) -> None:
+        blob = self.load()
+        self.chunks = blob["chunks"]
+        # Passing embeddings up front stops the store from re-embedding the chunks
+        self.storage.collection.upsert(
+            ids=[f"{blob['hash']}-{index}" for index in range(len(self.chunks))],
+            documents=self.chunks,
+            embeddings=blob["embeddings"],
+        )
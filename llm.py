@@ -0,0 +1,117 @@
+import functools
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Union
+import litellm
+from crewai import LLM
+from diskcache import Cache
+from http_clients import sync_client
+
+LLM_CACHE_DIR = "outputs/.llm_cache"
+LLM_CACHE_TTL = 7 * 24 * 60 * 60  # One week, in seconds
+MAX_CACHEABLE_TEMPERATURE = 0.3   # Above this, responses are too varied to reuse
+
+
+class CachedLLM(LLM):
+    """LLM that reuses responses for identical low-temperature requests.
+
+    Responses are persisted in a disk cache so re-running the pipeline on an
+    unchanged paper skips the API entirely. For Anthropic models the system
+    prompt and the first user message, which carries the task and the paper
+    text, are also marked for provider-side prompt caching.
+    """
+
+    def __init__(self, *args, cache_dir: str = LLM_CACHE_DIR, prompt_caching: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_dir = cache_dir
+        self.prompt_caching = prompt_caching
+        self._cache: Optional[Cache] = None
+
+    @property
+    def cache(self) -> Cache:
+        """Open the disk cache on first use."""
+        if self._cache is None:
+            self._cache = Cache(self.cache_dir)
+        return self._cache
+
+    @property
+    def cacheable(self) -> bool:
+        """Only near-deterministic calls are worth caching."""
+        return self.temperature is None or self.temperature <= MAX_CACHEABLE_TEMPERATURE
+
+    def cache_key(
+        self,
+        messages: Union[str, List[Dict[str, Any]]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> str:
+        """Hash everything that can change the response."""
+        tool_names = sorted(
+            tool.get("function", {}).get("name", "") for tool in tools or []
+        )
+        response_format = getattr(self, "response_format", None)
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "tools": tool_names,
+            "response_format": getattr(response_format, "__name__", response_format),
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _with_prompt_caching(self, messages: Union[str, List[Dict[str, Any]]]):
+        """Mark the stable prompt prefix as cacheable for Anthropic models."""
+        if not (self.prompt_caching and self.model.startswith("anthropic/")):
+            return messages
+        if not isinstance(messages, list):
+            return messages
+
+        marked = []
+        first_user_seen = False
+        for message in messages:
+            role = message.get("role")
+            cacheable = role == "system" or (role == "user" and not first_user_seen)
+            first_user_seen = first_user_seen or role == "user"
+            if cacheable and isinstance(message.get("content"), str):
+                message = {
+                    **message,
+                    "content": [{
+                        "type": "text",
+                        "text": message["content"],
+                        "cache_control": {"type": "ephemeral"},
+                    }],
+                }
+            marked.append(message)
+        return marked
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, Any]]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        *args,
+        **kwargs,
+    ) -> Union[str, Any]:
+        # Opened on the first call so importing this module stays side-effect free.
+        # Only LiteLLM's OpenAI-compatible providers use client_session; Anthropic
+        # calls still go through LiteLLM's own HTTP handler.
+        if litellm.client_session is None:
+            litellm.client_session = sync_client()
+
+        if not self.cacheable:
+            return super().call(self._with_prompt_caching(messages), tools, *args, **kwargs)
+
+        key = self.cache_key(messages, tools)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = super().call(self._with_prompt_caching(messages), tools, *args, **kwargs)
+        if isinstance(response, str) and response:
+            self.cache.set(key, response, expire=LLM_CACHE_TTL)
+        return response
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm(model: str, temperature: float) -> CachedLLM:
+    """Return the shared LLM for a model and temperature, creating it on first use."""
+    return CachedLLM(model=model, temperature=temperature)
@@ -1,12 +1,20 @@
-from crewai import Agent, Task, Crew, Process, LLM
-from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
+from crewai import Agent, Task, Crew, Process
 from crewai_tools import SerperDevTool
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
+from pathlib import Path
 from dotenv import load_dotenv
+import anthropic
+import argparse
+import asyncio
 import os
-from tools import PodcastAudioGenerator, PodcastMixer, VoiceConfig
+from knowledge import CachedPDFKnowledgeSource
+from llm import get_llm
+from script_edits import apply_edits
+from streaming import stream_enhanced_script
+from tasks import StructuredTask, strict_json_schema, write_json
+from tools import BatchSerperDevTool, PodcastAudioGenerator, PodcastMixer, VoiceConfig
 
 
 def setup_directories():
@@ -21,17 +29,42 @@ def setup_directories():
     }
     
     for directory in dirs.values():
-        os.makedirs(directory, exist_ok=True)
+        Path(directory).mkdir(parents=True, exist_ok=True)
     
     return dirs
 
 # Load environment variables
 load_dotenv()
 
+REQUIRED_ENV = [
+    "CLAUDIA_VOICE_ID",
+    "BEN_VOICE_ID",
+    "OPENAI_API_KEY",
+    "ANTHROPIC_API_KEY",
+    "SERPER_API_KEY",
+    "ELEVENLABS_API_KEY",
+]
+
+def validate_environment():
+    """Fail fast on missing settings instead of after the expensive LLM tasks."""
+    missing = [key for key in REQUIRED_ENV if not os.environ.get(key)]
+    if missing:
+        raise SystemExit(f"Missing environment variables: {', '.join(missing)}")
+
 # --- PDF Knowledge Source ---
-research_paper = PDFKnowledgeSource(file_paths="workplace-prod.pdf")
+# The full paper goes straight into the prompts when it fits; otherwise it is
+# embedded once per PDF for retrieval and later runs load the cached vectors
+PAPER_FILE = "workplace-prod.pdf"
+research_paper = CachedPDFKnowledgeSource(file_path=PAPER_FILE)
 
 # --- Pydantic Models definitions ---
+class PaperTopics(BaseModel):
+    """Key topics extracted from a research paper."""
+    title: str = Field(..., description="Title of the research paper")
+    research_field: str = Field(..., description="Academic field the paper belongs to")
+    topics: List[str] = Field(..., description="Main themes of the paper as a list of strings")
+    keywords: List[str] = Field(..., description="Search keywords for finding related material")
+
 class PaperSummary(BaseModel):
     """Summary of a research paper."""
     title: str = Field(..., description="Title of the research paper")                   
@@ -42,6 +75,18 @@ class PaperSummary(BaseModel):
     future_work: List[str] = Field(..., description="Future research directions as a list")
     summary_date: datetime = Field(..., description="Timestamp of summary creation")
 
+class SupportingItem(BaseModel):
+    """Supporting material found for a research paper."""
+    title: str = Field(..., description="Title of the article, report, or discussion")
+    source: str = Field(..., description="Publisher or website the material comes from")
+    url: str = Field(..., description="Link to the material")
+    relevance: str = Field(..., description="How the material relates to the paper")
+
+class PaperBrief(BaseModel):
+    """Paper summary combined with its supporting materials."""
+    summary: PaperSummary = Field(..., description="Summary of the research paper")
+    supporting: List[SupportingItem] = Field(..., description="Recent supporting materials")
+
 class DialogueLine(BaseModel):
     """Dialogue line for a podcast script."""
     speaker: str = Field(..., description="Name of the speaker (Julia or Guido)")
@@ -51,65 +96,65 @@ class PodcastScript(BaseModel):
     """Podcast script with dialogue lines."""
     dialogue: List[DialogueLine] = Field(..., description="Ordered list of dialogue lines")
 
+class ScriptEdit(BaseModel):
+    """One JSON Patch operation against a draft podcast script."""
+    op: str = Field(..., description='Either "replace", "add", or "remove"')
+    path: str = Field(..., description='Target in the draft, e.g. "/dialogue/3/text", "/dialogue/3", or "/dialogue/-" to append')
+    value: Union[DialogueLine, str, None] = Field(..., description="New text for a /text path, a full line for a line path, null for remove")
+
+class ScriptEdits(BaseModel):
+    """Edits an enhancer made to a draft podcast script."""
+    patch: List[ScriptEdit] = Field(..., description="JSON Patch operations in ascending line order")
+
 class AudioGeneration(BaseModel):
     """Audio generation result with metadata."""
     segment_files: List[str] = Field(..., description="List of generated audio segment files")
     final_podcast: str = Field(..., description="Path to the final mixed podcast file")
 
+# JSON schemas compiled once and sent to the LLMs for constrained decoding
+TOPICS_SCHEMA = strict_json_schema(PaperTopics.model_json_schema())
+SUMMARY_SCHEMA = strict_json_schema(PaperSummary.model_json_schema())
+BRIEF_SCHEMA = strict_json_schema(PaperBrief.model_json_schema())
+SCRIPT_SCHEMA = strict_json_schema(PodcastScript.model_json_schema())
+EDITS_SCHEMA = strict_json_schema(ScriptEdits.model_json_schema())
+
 # --- LLM Setup ---
-summary_llm = LLM(
-    model="openai/o1-preview",
-    temperature=0.0,
-)
+# Low-temperature responses are cached on disk between runs, and agents that
+# share a model and temperature share one client (see llm.py)
+topic_llm = get_llm("openai/gpt-4o-mini", 0.0)
 
-script_llm = LLM(
-    model="openai/o1-preview",
-    temperature=0.3,
-)
+# Set USE_REASONING_MODEL=1 to run the summary and script steps on o1-preview
+# for side-by-side quality comparisons.
+use_reasoning_model = os.getenv("USE_REASONING_MODEL", "").lower() in ("1", "true", "yes")
 
-script_enhancer_llm = LLM(
-    model="anthropic/claude-3-5-sonnet-20241022",
-    temperature=0.7,
-)
+if use_reasoning_model:
+    summary_llm = get_llm("openai/o1-preview", 0.0)
 
-audio_llm = LLM(
-    model="cerebras/llama3.3-70b",
-    temperature=0.0,
-)
+    script_llm = get_llm("openai/o1-preview", 0.3)
+else:
+    summary_llm = get_llm("openai/gpt-4o-2024-11-20", 0.0)
 
-# Create and configure tools
-dirs = setup_directories()
-audio_generator = PodcastAudioGenerator(output_dir=dirs['SEGMENTS'])
-
-# Julia: Enthusiastic expert
-audio_generator.add_voice(
-    "Julia", 
-    os.getenv("CLAUDIA_VOICE_ID"),
-    VoiceConfig(
-        stability=0.35,  # More variation for natural enthusiasm
-        similarity_boost=0.75,  # Maintain voice consistency
-        style=0.65,  # Good expressiveness without being over the top
-        use_speaker_boost=True
-    )
-)
+    # Cheap first draft; script_enhancer_llm only edits the lines that need it
+    script_llm = get_llm("openai/gpt-4o-mini", 0.4)
 
-# Guido: Engaged and curious
-audio_generator.add_voice(
-    "Guido", 
-    os.getenv("BEN_VOICE_ID"),
-    VoiceConfig(
-        stability=0.4,  # Slightly more stable but still natural
-        similarity_boost=0.75,
-        style=0.6,  # Balanced expressiveness
-        use_speaker_boost=True
-    )
-)
+script_enhancer_llm = get_llm("anthropic/claude-3-5-sonnet-20241022", 0.7)
 
-podcast_mixer = PodcastMixer(output_dir=dirs['FINAL'])
+# Create tools
 search_tool = SerperDevTool()
+batch_search_tool = BatchSerperDevTool()
 
 
 # --- Agents ---
+topic_scout = Agent(
+    role="Topic Scout",
+    goal="Quickly identify the core themes of a research paper",
+    backstory="""You're a fast-reading research librarian who can skim an academic
+    paper and pin down its field, main themes, and the keywords needed to find
+    related work.""",
+    verbose=True,
+    llm=topic_llm
+)
+
 researcher = Agent(
     role="Research Analyst",
     goal="Create comprehensive yet accessible research paper summaries",
@@ -127,9 +172,11 @@ research_support = Agent(
     supplementary information across academic fields. You have a talent for 
     connecting academic research with real-world applications, current events, 
     and practical examples, regardless of the field. You know how to find 
-    credible sources and relevant discussions across various domains.""",
+    credible sources and relevant discussions across various domains.
+    When multiple angles are needed, call `search_many` once with all queries
+    rather than searching repeatedly one query at a time.""",
     verbose=True,
-    tools=[search_tool],
+    tools=[batch_search_tool, search_tool],
     llm=script_enhancer_llm
 )
 
@@ -162,20 +209,23 @@ script_enhancer = Agent(
     llm=script_enhancer_llm 
 )
 
-audio_generator_agent = Agent(
-    role="Audio Generation Specialist",
-    goal="Generate high-quality podcast audio with natural-sounding voices",
-    backstory="""You are an expert in audio generation and processing. You understand 
-    how to generate natural-sounding voices and create professional podcast audio. You 
-    consider pacing, tone, and audio quality in your productions.""",
-    verbose=True,
-    allow_delegation=False,
-    tools=[audio_generator, podcast_mixer],
-    llm=audio_llm
+# --- Tasks ---
+topic_task = StructuredTask(
+    description="""Skim the research paper provided in {paper} and extract its
+    title, research field, main themes, and a handful of search keywords.
+    Don't summarize the findings in depth; another researcher will do that.
+
+    {paper_content}""",
+    expected_output="The paper's title, field, main topics, and search keywords.",
+    agent=topic_scout,
+    output_pydantic=PaperTopics,
+    response_schema=TOPICS_SCHEMA,
+    output_file="output/metadata/paper_topics.json"
 )
 
-# --- Tasks ---
-summary_task = Task(
+# summary_task and supporting_research_task only depend on the paper and its
+# topics, so they run concurrently and join at podcast_task.
+summary_task = StructuredTask(
     description="""Hey there, researcher! Your mission is to dive into the
     research paper provided in {paper} and uncover its core insights.
     As you create the summary, please:
@@ -187,15 +237,19 @@ summary_task = Task(
     - Look Ahead: Offer some thoughts on future research directions.
 
     Keep your tone engaging and friendly so that an educated general audience can
-    easily follow along while staying true to the technical details.""",
+    easily follow along while staying true to the technical details.
+
+    {paper_content}""",
     expected_output="A clear, well-structured summary that covers all the critical aspects of the paper in an accessible and engaging manner.",
     agent=researcher,
     output_pydantic=PaperSummary,
+    response_schema=SUMMARY_SCHEMA,
+    async_execution=True,
     output_file="output/metadata/paper_summary.json"
 )
 
 supporting_research_task = Task(
-    description="""Alright, now that we have the paper summary, let’s add some
+    description="""Alright, now that we have the paper's key topics, let’s add some
     real-world flavor. Your task is to gather recent and credible supporting
     materials that enrich the topic. Here’s how to proceed:
 
@@ -210,11 +264,40 @@ supporting_research_task = Task(
     are recent, reliable, and add that extra context.""",
     expected_output="A curated collection of supporting materials and real-world examples that add context and depth to the research paper’s topic.",
     agent=research_support,
-    context=[summary_task],
+    context=[topic_task],
+    async_execution=True,
     output_file="output/metadata/supporting_research.json"
 )
 
-podcast_task = Task(
+# Single-pass alternative to summary_task + supporting_research_task: one agent
+# reads the paper, searches for context, and returns both in one answer.
+brief_task = StructuredTask(
+    description="""Dive into the research paper provided in {paper} and prepare a
+    complete brief for our podcast writers in a single pass.
+
+    First, summarize the paper:
+    - Highlight the Big Ideas: What are the main findings and conclusions?
+    - Explain the Method: Break down the study’s methodology in everyday language.
+    - Discuss the Impact: What are the key implications for the field?
+    - Note the Caveats: Mention any limitations or uncertainties.
+    - Look Ahead: Offer some thoughts on future research directions.
+
+    Then, search the web for recent and credible supporting materials: news,
+    case studies, expert opinions, and industry examples from the last couple
+    of years that show how the research plays out in real life.
+
+    Keep your tone engaging and friendly so that an educated general audience can
+    easily follow along while staying true to the technical details.
+
+    {paper_content}""",
+    expected_output="An accessible summary of the paper together with a curated list of recent supporting materials.",
+    agent=research_support,
+    output_pydantic=PaperBrief,
+    response_schema=BRIEF_SCHEMA,
+    output_file="output/metadata/paper_brief.json"
+)
+
+podcast_task = StructuredTask(
     description="""Using the paper summary and supporting research, craft a podcast-style
     conversation between Julia (the researcher) and Guido (the critical but
     constructive peer). The exchange should feel natural and conversational while
@@ -256,12 +339,13 @@ podcast_task = Task(
     agent=script_writer,
     context=[summary_task, supporting_research_task],
     output_pydantic=PodcastScript,
+    response_schema=SCRIPT_SCHEMA,
     output_file="output/metadata/podcast_script.json"
 )
 
-enhance_script_task = Task(
-    description="""Now, take the initial author–reviewer script and refine it so
-    that it feels like a genuine academic yet conversational dialogue.
+enhance_script_task = StructuredTask(
+    description="""Now, take the initial author–reviewer draft script and edit it
+    line by line so that it feels like a genuine academic yet conversational dialogue.
 
     - Infuse Realism: Add natural markers like "That’s interesting," "I see,"
       or "Let me clarify that…" to mimic real back-and-forth.
@@ -273,67 +357,249 @@ enhance_script_task = Task(
     - Encourage Constructive Tone: Even when critical, the Reviewer should balance
       with constructive advice.
 
+    Return only your modifications, as JSON Patch operations against the draft:
+    - {"op": "replace", "path": "/dialogue/3/text", "value": "..."} rewrites line 3.
+    - {"op": "add", "path": "/dialogue/3", "value": {"speaker": "Guido", "text": "..."}}
+      inserts a new line before line 3; use "/dialogue/-" to append at the end.
+    - {"op": "remove", "path": "/dialogue/3", "value": null} drops line 3.
+    Line numbers are zero-based positions in the draft's dialogue list exactly as
+    you received it; don't adjust them for your own earlier edits. List operations
+    in ascending line order. Lines that are already good need no operation at all.
+
     Important:
     - Do not rename or replace the roles (Julia, Guido).
     - Avoid stage directions (e.g., *laughs*); let tone come through in words.
 
-    Your enhanced script should sound like you’re listening to an actual peer-review
-    exchange—thoughtful, occasionally sharp, but ultimately collaborative and enlightening.""",
-    expected_output="An enhanced podcast script that realistically simulates an author–reviewer exchange, engaging and educational while maintaining technical accuracy.",
+    The edited script should sound like you’re listening to an actual peer-review
+    exchange—thoughtful, occasionally sharp, but ultimately collaborative and enlightening.
+
+    Draft script, one numbered line per dialogue entry:
+    {draft}
+    {feedback}""",
+    expected_output="JSON Patch edits that turn the draft into a realistic, engaging author–reviewer exchange while maintaining technical accuracy.",
     agent=script_enhancer,
-    context=[summary_task, podcast_task],
-    output_pydantic=PodcastScript,
-    output_file="output/metadata/enhanced_podcast_script.json",
-    human_input=True
+    context=[summary_task],
+    output_pydantic=ScriptEdits,
+    response_schema=EDITS_SCHEMA,
+    output_file="output/metadata/script_edits.json"
 )
+# --- Crew and Process ---
+def setup_audio_tools(dirs: Dict[str, str]) -> Tuple[PodcastAudioGenerator, PodcastMixer]:
+    """Create the voice synthesis and mixing tools for one run."""
+    audio_generator = PodcastAudioGenerator(output_dir=dirs['SEGMENTS'])
+
+    # Julia: Enthusiastic expert
+    audio_generator.add_voice(
+        "Julia", 
+        os.getenv("CLAUDIA_VOICE_ID"),
+        VoiceConfig(
+            stability=0.35,  # More variation for natural enthusiasm
+            similarity_boost=0.75,  # Maintain voice consistency
+            style=0.65,  # Good expressiveness without being over the top
+            use_speaker_boost=True
+        )
+    )
 
+    # Guido: Engaged and curious
+    audio_generator.add_voice(
+        "Guido", 
+        os.getenv("BEN_VOICE_ID"),
+        VoiceConfig(
+            stability=0.4,  # Slightly more stable but still natural
+            similarity_boost=0.75,
+            style=0.6,  # Balanced expressiveness
+            use_speaker_boost=True
+        )
+    )
 
-audio_task = Task(
-    description="""Generate high-quality audio for the podcast script and create the final podcast.
-
-    The script will be provided in the context as a list of dialogue entries, each with:
-    - speaker: Either "Julia" or "Guido"
-    - text: The line to be spoken
-
-    Process:
-    1. Generate natural-sounding audio for each line of dialogue using appropriate voices
-    2. Apply audio processing for professional quality:
-       - Normalize audio levels
-       - Add subtle fade effects between segments
-       - Apply appropriate pacing and pauses
-    3. Mix all segments into a cohesive final podcast
-
-    Voice Assignments:
-    - For Julia's lines: Use configured Julia voice
-    - For Guido's lines: Use configured Guido voice
-
-    Quality Guidelines:
-    - Ensure consistent audio levels across all segments
-    - Maintain natural pacing and flow
-    - Create smooth transitions between speakers
-    - Verify audio clarity and quality""",
-    expected_output="A professional-quality podcast audio file with natural-sounding voices and smooth transitions",
-    agent=audio_generator_agent,
-    context=[enhance_script_task],
-    output_pydantic=AudioGeneration,
-    output_file="output/metadata/audio_generation_meta.json"
-)
-# --- Crew and Process ---
-crew = Crew(
-    agents=[researcher, research_support, script_writer, script_enhancer, audio_generator_agent],
-    tasks=[summary_task, supporting_research_task, podcast_task, enhance_script_task, audio_task],
-    process=Process.sequential,
-    knowledge_sources=[research_paper],
-    verbose=True
-)
+    podcast_mixer = PodcastMixer(output_dir=dirs['FINAL'])
+    return audio_generator, podcast_mixer
+
+def build_crew(detailed: bool = False, dirs: Optional[Dict[str, str]] = None) -> Crew:
+    """Assemble the crew that researches the paper and drafts the script.
 
-if __name__ == "__main__":    
-    # Update task output files
+    By default the paper is summarized and researched in one brief_task. With
+    detailed=True, separate agents extract topics, summarize, and research,
+    trading extra LLM round-trips for more thorough output. Task outputs are
+    written under dirs['DATA'], creating a new run directory if none is given.
+    Kick the crew off with paper_inputs(), which fills in {paper_content}.
+    """
+    dirs = dirs or setup_directories()
+    topic_task.output_file = os.path.join(dirs['DATA'], "paper_topics.json")
     summary_task.output_file = os.path.join(dirs['DATA'], "paper_summary.json")
     supporting_research_task.output_file = os.path.join(dirs['DATA'], "supporting_research.json")
+    brief_task.output_file = os.path.join(dirs['DATA'], "paper_brief.json")
     podcast_task.output_file = os.path.join(dirs['DATA'], "podcast_script.json")
-    enhance_script_task.output_file = os.path.join(dirs['DATA'], "enhanced_podcast_script.json")
-    audio_task.output_file = os.path.join(dirs['DATA'], "audio_generation_meta.json")
-    
-    # Run the podcast generation process
-    results = crew.kickoff(inputs={"paper": "workplace-prod.pdf"})
\ No newline at end of file
+    enhance_script_task.output_file = os.path.join(dirs['DATA'], "script_edits.json")
+
+    if detailed:
+        research_agents = [topic_scout, researcher, research_support]
+        research_tasks = [topic_task, summary_task, supporting_research_task]
+        podcast_task.context = [summary_task, supporting_research_task]
+        enhance_script_task.context = [summary_task]
+    else:
+        research_agents = [research_support]
+        research_tasks = [brief_task]
+        podcast_task.context = [brief_task]
+        enhance_script_task.context = [brief_task]
+
+    return Crew(
+        agents=research_agents + [script_writer],
+        tasks=research_tasks + [podcast_task],
+        process=Process.sequential,
+        knowledge_sources=[] if research_paper.fits_in_context() else [research_paper],
+        verbose=True
+    )
+
+def paper_inputs() -> Dict[str, str]:
+    """Kickoff inputs, with the full paper text whenever it fits in the prompt."""
+    if research_paper.fits_in_context():
+        paper_content = f"Here is the full text of the paper:\n\n{research_paper.markdown()}"
+    else:
+        paper_content = "The paper is too long to quote here; rely on the passages retrieved from it."
+    return {"paper": PAPER_FILE, "paper_content": paper_content}
+
+def create_enhancement_crew() -> Crew:
+    """Assemble the batch crew that edits the full draft in one pass."""
+    return Crew(
+        agents=[script_enhancer],
+        tasks=[enhance_script_task],
+        process=Process.sequential,
+        verbose=True
+    )
+
+def apply_script_edits(draft: PodcastScript, edits: ScriptEdits) -> PodcastScript:
+    """Apply the enhancer's JSON Patch to the draft script."""
+    dialogue = apply_edits(
+        [line.model_dump() for line in draft.dialogue],
+        [edit.model_dump() for edit in edits.patch]
+    )
+    return PodcastScript(dialogue=dialogue)
+
+def enhanced_script_file() -> str:
+    """Path of the full enhanced script, next to the enhancer's edits."""
+    return os.path.join(os.path.dirname(enhance_script_task.output_file), "enhanced_podcast_script.json")
+
+def run_audio(
+    script: PodcastScript,
+    audio_generator: PodcastAudioGenerator,
+    podcast_mixer: PodcastMixer
+) -> AudioGeneration:
+    """Synthesize every line of the script and mix the final podcast.
+
+    Plain tool calls; choosing voices and mixing segments needs no LLM.
+    """
+    segment_files = asyncio.run(audio_generator.synthesize_all(script.dialogue))
+    return AudioGeneration(
+        segment_files=segment_files,
+        final_podcast=podcast_mixer.run(audio_files=segment_files)
+    )
+
+def numbered_script(script: PodcastScript) -> str:
+    """One zero-based numbered line per dialogue entry, as the edits address them."""
+    return "\n".join(
+        f"{index}. {line.speaker}: {line.text}"
+        for index, line in enumerate(script.dialogue)
+    )
+
+def enhancement_inputs(feedback: str = "") -> Dict[str, str]:
+    """Kickoff inputs for enhance_script_task: the numbered draft and any review feedback."""
+    return {
+        "draft": numbered_script(podcast_task.structured_output()),
+        "feedback": feedback,
+    }
+
+def review_script(script: PodcastScript) -> str:
+    """Show the enhanced script for human review; returns feedback, empty if approved."""
+    print("\n=== Enhanced podcast script ===")
+    print(numbered_script(script))
+    return input("\nPress Enter to approve the script, or describe what to change: ").strip()
+
+def batch_podcast(audio_generator: PodcastAudioGenerator, podcast_mixer: PodcastMixer) -> AudioGeneration:
+    """Edit the whole draft, with human review of the edited script, then generate the audio."""
+    feedback = ""
+    while True:
+        create_enhancement_crew().kickoff(inputs=enhancement_inputs(feedback))
+        script = apply_script_edits(podcast_task.structured_output(), enhance_script_task.structured_output())
+        review = review_script(script)
+        if not review:
+            break
+        # Edits always address the original draft, so show what was tried and why it fell short
+        feedback = (
+            f"\nYour previous edits were:\n{enhance_script_task.output.raw}\n"
+            f"A human reviewer read the resulting script and asked for these changes:\n{review}"
+        )
+    write_json(enhanced_script_file(), script)
+    return run_audio(script, audio_generator, podcast_mixer)
+
+def enhancement_prompts() -> Tuple[str, str]:
+    """Build the script enhancer's system prompt and request from the finished drafts."""
+    system_prompt = (
+        f"You are {script_enhancer.role}. {script_enhancer.backstory}\n"
+        f"Your personal goal is: {script_enhancer.goal}"
+    )
+    context = "\n\n".join(task.output.raw for task in enhance_script_task.context)
+    description = enhance_script_task.description
+    for key, value in enhancement_inputs().items():
+        description = description.replace(f"{{{key}}}", value)
+    prompt = (
+        f"{description}\n\n"
+        f"Expected output: {enhance_script_task.expected_output}\n\n"
+        f"This is the context you're working with:\n{context}"
+    )
+    return system_prompt, prompt
+
+def stream_podcast(audio_generator: PodcastAudioGenerator, podcast_mixer: PodcastMixer) -> AudioGeneration:
+    """Enhance the draft script while synthesizing finished lines, then mix.
+
+    Text-to-speech starts on each line as soon as Claude's edits can no longer
+    touch it, hiding most of the audio latency behind script generation.
+    """
+    system_prompt, prompt = enhancement_prompts()
+    dialogue, segment_files = asyncio.run(stream_enhanced_script(
+        audio_generator,
+        draft=[line.model_dump() for line in podcast_task.structured_output().dialogue],
+        model=script_enhancer_llm.model,
+        system_prompt=system_prompt,
+        prompt=prompt,
+        temperature=script_enhancer_llm.temperature
+    ))
+    write_json(enhanced_script_file(), PodcastScript(dialogue=dialogue))
+
+    return AudioGeneration(
+        segment_files=segment_files,
+        final_podcast=podcast_mixer.run(audio_files=segment_files)
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turn a research paper into a review podcast.")
+    parser.add_argument(
+        "--detailed",
+        action="store_true",
+        help="Summarize and research the paper with separate agents (slower, more thorough)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Generate audio while the script is being enhanced (faster, skips human review of the script)"
+    )
+    args = parser.parse_args()
+    validate_environment()
+
+    # Research the paper and draft the script
+    dirs = setup_directories()
+    crew = build_crew(detailed=args.detailed, dirs=dirs)
+    crew.kickoff(inputs=paper_inputs())
+
+    # Enhance the script and generate the podcast audio
+    audio_generator, podcast_mixer = setup_audio_tools(dirs)
+    results = None
+    if args.stream:
+        try:
+            results = stream_podcast(audio_generator, podcast_mixer)
+        except anthropic.APIError as e:
+            print(f"Streaming enhancement failed, falling back to batch mode: {str(e)}")
+
+    if results is None:
+        results = batch_podcast(audio_generator, podcast_mixer)
+    write_json(os.path.join(dirs['DATA'], "audio_generation_meta.json"), results)
\ No newline at end of file
@@ -0,0 +1,133 @@
+import re
+from typing import Dict, List, Optional, Tuple
+import jsonpatch
+
+# Edits address lines by their position in the draft, e.g. "/dialogue/3/text"
+EDIT_PATH = re.compile(r"^/dialogue/(\d+|-)(?:/(speaker|text))?$")
+
+
+def edit_target(edit: Dict, length: int) -> Optional[Tuple[int, Optional[str]]]:
+    """Return the draft line index and field an edit points at, or None if it is invalid."""
+    op = edit.get("op")
+    match = EDIT_PATH.match(str(edit.get("path", "")))
+    if op not in ("add", "replace", "remove") or not match:
+        return None
+
+    index = length if match.group(1) == "-" else int(match.group(1))
+    field = match.group(2)
+    value = edit.get("value")
+
+    if op == "add":
+        valid = field is None and index <= length
+    else:
+        valid = index < length and (op == "replace" or field is None)
+    if op != "remove":
+        if field is None:
+            valid = valid and isinstance(value, dict) and bool(value.get("speaker")) and bool(value.get("text"))
+        else:
+            valid = valid and isinstance(value, str) and bool(value)
+    return (index, field) if valid else None
+
+
+def to_json_patch(edits: List[Dict], length: int) -> List[Dict]:
+    """Turn edits addressed against the draft into a sequential JSON Patch.
+
+    Every edit path refers to the draft as the enhancer saw it. JSON Patch
+    applies operations one after another, so they are reordered from the end
+    of the script backwards to keep the earlier indices valid. At a single
+    index, changes to the existing line come before insertions, and the
+    insertions run in reverse so the new lines keep the order they were given.
+    """
+    targeted = []
+    for order, edit in enumerate(edits):
+        target = edit_target(edit, length)
+        if target is None:
+            print(f"Skipping invalid script edit: {edit}")
+            continue
+        targeted.append((target, order, edit))
+
+    removed = {index for (index, _), _, edit in targeted if edit["op"] == "remove"}
+    operations = []
+    for (index, field), order, edit in targeted:
+        is_add = edit["op"] == "add"
+        if not is_add and index in removed and edit["op"] != "remove":
+            continue  # The line is removed anyway
+        operation = {
+            "op": edit["op"],
+            "path": f"/dialogue/{index}" + (f"/{field}" if field else ""),
+        }
+        if edit["op"] != "remove":
+            operation["value"] = edit["value"]
+        operations.append(((-index, is_add, -order if is_add else order), operation))
+
+    # A line removed twice only needs one remove
+    patch, seen_removes = [], set()
+    for _, operation in sorted(operations, key=lambda item: item[0]):
+        if operation["op"] == "remove":
+            if operation["path"] in seen_removes:
+                continue
+            seen_removes.add(operation["path"])
+        patch.append(operation)
+    return patch
+
+
+def apply_edits(dialogue: List[Dict], edits: List[Dict]) -> List[Dict]:
+    """Apply enhancer edits to draft dialogue lines, returning the edited lines."""
+    patch = to_json_patch(edits, len(dialogue))
+    return jsonpatch.apply_patch({"dialogue": dialogue}, patch)["dialogue"]
+
+
+class EditedDialogue:
+    """Release final dialogue lines while edits are still streaming in.
+
+    Edits must arrive in ascending line order. Once an edit for line k
+    arrives, every draft line before k can no longer change, so those lines
+    are released straight away, unchanged or edited.
+    """
+
+    def __init__(self, draft: List[Dict]):
+        self.draft = draft
+        self.cursor = 0  # First draft line not yet released
+        self.pending: List[Dict] = []  # Edits for the line at the cursor
+
+    def _rebase(self, edit: Dict) -> Dict:
+        index, field = edit_target(edit, len(self.draft))
+        return {**edit, "path": f"/dialogue/{index - self.cursor}" + (f"/{field}" if field else "")}
+
+    def _resolve(self, until: int) -> List[Dict]:
+        """Release the lines before `until`, applying edits queued for the cursor line."""
+        released = []
+        if self.pending:
+            line = self.draft[self.cursor:self.cursor + 1]
+            edits = [self._rebase(edit) for edit in self.pending]
+            self.pending = []
+            try:
+                released += apply_edits(line, edits)
+            except jsonpatch.JsonPatchException as e:
+                print(f"Skipping script edits for line {self.cursor}: {str(e)}")
+                released += line
+            self.cursor = min(self.cursor + 1, len(self.draft))
+
+        released += self.draft[self.cursor:until]
+        self.cursor = max(self.cursor, min(until, len(self.draft)))
+        return released
+
+    def feed(self, edit: Dict) -> List[Dict]:
+        """Queue one edit and return any lines it finalizes."""
+        target = edit_target(edit, len(self.draft))
+        if target is None:
+            print(f"Skipping invalid script edit: {edit}")
+            return []
+
+        index = target[0]
+        if index < self.cursor:
+            print(f"Skipping out-of-order script edit: {edit}")
+            return []
+
+        released = self._resolve(index) if index > self.cursor else []
+        self.pending.append(edit)
+        return released
+
+    def flush(self) -> List[Dict]:
+        """Release everything left once the edit stream has ended."""
+        return self._resolve(len(self.draft))
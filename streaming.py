@@ -0,0 +1,105 @@
+import asyncio
+import json
+from typing import Dict, List, Tuple
+from anthropic import AsyncAnthropic
+from http_clients import async_client
+from script_edits import EditedDialogue
+from tools import PodcastAudioGenerator
+
+JSONL_INSTRUCTIONS = """Write your edits as JSON Lines: one JSON Patch operation per
+line, in ascending line order, each shaped like
+{"op": "replace", "path": "/dialogue/3/text", "value": "..."}.
+Output nothing else: no wrapping object, no code fences, no commentary."""
+
+
+class JsonLinesParser:
+    """Collect complete JSON objects from a streamed JSON Lines response."""
+
+    def __init__(self):
+        self.buffer = ""
+
+    def _parse(self, raw: str) -> List[Dict]:
+        raw = raw.strip()
+        if not raw.startswith("{"):
+            return []  # Stray code fences or commentary
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            print(f"Skipping malformed JSON line: {raw[:80]}")
+            return []
+        return [item] if isinstance(item, dict) else []
+
+    def feed(self, text: str) -> List[Dict]:
+        """Add streamed text and return any objects it completed."""
+        self.buffer += text
+        *complete, self.buffer = self.buffer.split("\n")
+        return [line for raw in complete for line in self._parse(raw)]
+
+    def flush(self) -> List[Dict]:
+        """Return the final object once the stream has ended."""
+        raw, self.buffer = self.buffer, ""
+        return self._parse(raw)
+
+
+async def stream_enhanced_script(
+    audio_generator: PodcastAudioGenerator,
+    draft: List[Dict],
+    model: str,
+    system_prompt: str,
+    prompt: str,
+    temperature: float = 0.7,
+    max_tokens: int = 8192,
+) -> Tuple[List[Dict], List[str]]:
+    """Stream edits to the draft script and synthesize each line once it is final.
+
+    Claude only emits edits, in line order, so every draft line before the
+    one being edited is already final and goes to text-to-speech while the
+    rest of the edits are still generating. Returns the edited dialogue lines
+    and their audio files, both in speaking order.
+
+    Any API error propagates after in-flight synthesis is cancelled, so the
+    caller can fall back to the batch pipeline.
+    """
+    parser = JsonLinesParser()
+    edited = EditedDialogue(draft)
+    dialogue: List[Dict] = []
+    synthesis: List[asyncio.Task] = []
+
+    def dispatch(lines: List[Dict]) -> None:
+        for line in lines:
+            synthesis.append(asyncio.create_task(
+                audio_generator.synthesize_line(len(dialogue), line["speaker"], line["text"])
+            ))
+            dialogue.append(line)
+
+    # Claude and ElevenLabs share one connection pool for the whole stream
+    async with async_client() as http_client, audio_generator.session():
+        client = AsyncAnthropic(http_client=http_client)
+        try:
+            async with client.messages.stream(
+                model=model.removeprefix("anthropic/"),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=[{
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }],
+                messages=[{"role": "user", "content": f"{prompt}\n\n{JSONL_INSTRUCTIONS}"}],
+            ) as stream:
+                async for text in stream.text_stream:
+                    for edit in parser.feed(text):
+                        dispatch(edited.feed(edit))
+            for edit in parser.flush():
+                dispatch(edited.feed(edit))
+            dispatch(edited.flush())
+        except BaseException:
+            for task in synthesis:
+                task.cancel()
+            await asyncio.gather(*synthesis, return_exceptions=True)
+            raise
+
+        # Lines carry their index, so gathering in dispatch order keeps the script order
+        audio_files = await asyncio.gather(*synthesis)
+
+    return dialogue, [filename for filename in audio_files if filename]
@@ -0,0 +1,131 @@
+import copy
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import orjson
+from crewai import Task
+from litellm import supports_response_schema
+from pydantic import BaseModel, Field, ValidationError
+
+
+def write_json(path: str, output: BaseModel) -> None:
+    """Write a Pydantic result as indented JSON using orjson."""
+    resolved_path = Path(path).expanduser().resolve()
+    resolved_path.parent.mkdir(parents=True, exist_ok=True)
+    resolved_path.write_bytes(
+        orjson.dumps(output.model_dump(mode="json"), option=orjson.OPT_INDENT_2)
+    )
+
+
+def strict_json_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Tighten a Pydantic JSON schema into the subset strict structured outputs accept.
+
+    Every object gets additionalProperties=false with all of its properties
+    required, and $ref nodes lose their sibling keywords.
+    """
+    schema = copy.deepcopy(schema)
+
+    def tighten(node: Any) -> None:
+        if isinstance(node, list):
+            for item in node:
+                tighten(item)
+            return
+        if not isinstance(node, dict):
+            return
+
+        if "$ref" in node:
+            for key in [key for key in node if key != "$ref"]:
+                del node[key]
+            return
+        if len(node.get("allOf", [])) == 1:
+            node.update(node.pop("allOf")[0])
+            tighten(node)
+            return
+
+        if node.get("type") == "object" and "properties" in node:
+            node["additionalProperties"] = False
+            node["required"] = list(node["properties"])
+        for value in node.values():
+            tighten(value)
+
+    tighten(schema)
+    return schema
+
+
+class StructuredTask(Task):
+    """Task whose agent LLM decodes straight into the output_pydantic schema.
+
+    The precompiled schema is sent as a strict json_schema response_format.
+    LiteLLM forwards it to OpenAI as-is and turns it into a forced tool call
+    for Anthropic models, so the answer always validates and CrewAI never has
+    to re-prompt for malformed JSON. Agents with tools are left alone, since
+    constrained decoding would stop them from calling those tools.
+
+    Structured results are written to output_file with orjson.
+    """
+
+    response_schema: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Strict JSON schema of output_pydantic, compiled once at startup",
+    )
+
+    @property
+    def response_format(self) -> Dict[str, Any]:
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": self.output_pydantic.__name__,
+                "schema": self.response_schema,
+                "strict": True,
+            },
+        }
+
+    def _constrain(self, agent: Any, tools: Optional[List[Any]]) -> bool:
+        """Whether this run can use constrained decoding."""
+        if self.output_pydantic is None or self.response_schema is None:
+            return False
+        if tools or getattr(agent, "tools", None):
+            return False
+        model = getattr(agent.llm, "model", None)
+        try:
+            return bool(model) and supports_response_schema(model=model)
+        except Exception:
+            return False
+
+    def _execute_core(self, agent: Any, context: Optional[str], tools: Optional[List[Any]]):
+        agent = agent or self.agent
+        if not self._constrain(agent, tools):
+            return super()._execute_core(agent, context, tools)
+
+        # Give this run its own LLM so agents sharing the original are unaffected
+        original_llm = agent.llm
+        agent.llm = copy.copy(original_llm)
+        agent.llm.response_format = self.response_format
+        try:
+            return super()._execute_core(agent, context, tools)
+        finally:
+            agent.llm = original_llm
+
+    def structured_output(self) -> BaseModel:
+        """Return the parsed answer, validating the raw text if CrewAI's conversion failed.
+
+        Raises RuntimeError when the task has not run or its answer does not
+        match output_pydantic.
+        """
+        if self.output is None:
+            raise RuntimeError(f"Task has no output yet: {self.name or self.description[:60]}")
+        if self.output.pydantic is not None:
+            return self.output.pydantic
+
+        raw = self.output.raw.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+        try:
+            return self.output_pydantic.model_validate_json(raw)
+        except ValidationError as e:
+            raise RuntimeError(
+                f"Task output is not a valid {self.output_pydantic.__name__}: {str(e)}"
+            ) from e
+
+    def _save_file(self, result: Any) -> None:
+        pydantic_output = self.output.pydantic if self.output else None
+        if pydantic_output is None:
+            return super()._save_file(result)
+        write_json(self.output_file, pydantic_output)
@@ -1,10 +1,21 @@
+import asyncio
+import hashlib
+import json
 import os
+import subprocess
+from contextlib import asynccontextmanager
 from typing import Dict, List, Optional, Any, Type
 from datetime import datetime
 from pydub import AudioSegment
 from crewai.tools import BaseTool
+from crewai_tools import SerperDevTool
 from pydantic import Field, BaseModel, ConfigDict
-from elevenlabs.client import ElevenLabs
+from elevenlabs.client import AsyncElevenLabs
+from diskcache import Cache
+import httpx
+from http_clients import async_client
+
+SERPER_SEARCH_URL = "https://google.serper.dev/search"
 
 class VoiceConfig(BaseModel):
     """Voice configuration settings."""
@@ -13,15 +24,17 @@ class VoiceConfig(BaseModel):
     style: float = 0.65  # Balanced expressiveness
     use_speaker_boost: bool = True
     model_id: str = "eleven_multilingual_v2"
-    output_format: str = "mp3_44100_128"
+    output_format: str = "mp3_44100_64"  # Half the bytes of 128k, plenty for speech
     apply_text_normalization: str = "auto"  # 'auto', 'on', or 'off'
 
 class AudioConfig(BaseModel):
     """Audio processing configuration."""
     format: str = "mp3"
-    sample_rate: int = 48000  # Higher for better quality
-    channels: int = 2
-    bitrate: str = "256k"     # Higher bitrate for clearer audio
+    sample_rate: int = 22050  # Final export; standard for spoken-word podcasts
+    channels: int = 1         # Use 44100 Hz stereo only if a platform requires it
+    bitrate: str = "96k"      # Plenty for voice at this rate
+    processing_sample_rate: int = 22050  # Internal rate for segments and mixing
+    processing_channels: int = 1         # Internal audio is 16-bit mono
     normalize: bool = True    # Normalize audio levels
     target_loudness: float = -14.0  # Standard podcast loudness (LUFS)
     compression_ratio: float = 2.0   # Light compression for voice
@@ -35,6 +48,67 @@ class PodcastAudioGeneratorInput(BaseModel):
     """Input for the podcast audio generation tool."""
     dialogue: List[Dialogue]
 
+class BatchSearchInput(BaseModel):
+    """Input for the batch web search tool."""
+    queries: List[str] = Field(..., description="Every search query to run, submitted together")
+
+class BatchSerperDevTool(SerperDevTool):
+    """Serper search tool that runs several queries concurrently."""
+
+    name: str = "search_many"
+    description: str = (
+        "Search the internet for several queries at once. Pass every query "
+        "you need in a single call; results are grouped by query."
+    )
+    args_schema: Type[BaseModel] = BatchSearchInput
+    max_concurrency: int = 10
+    timeout: float = 30.0
+
+    async def _search(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, query: str) -> Dict:
+        """Run one Serper query and keep only the fields the agent needs."""
+        try:
+            async with semaphore:
+                response = await client.post(
+                    SERPER_SEARCH_URL,
+                    json={"q": query, "num": self.n_results},
+                    headers={
+                        "X-API-KEY": os.getenv("SERPER_API_KEY", ""),
+                        "content-type": "application/json"
+                    },
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                data = response.json()
+        except Exception as e:
+            return {"query": query, "error": str(e)}
+
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": item.get("title"),
+                    "link": item.get("link"),
+                    "snippet": item.get("snippet")
+                }
+                for item in data.get("organic", [])[:self.n_results]
+            ]
+        }
+
+    async def search_many(self, queries: List[str]) -> List[Dict]:
+        """Run all queries concurrently over the shared connection pool."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with async_client() as client:
+            return await asyncio.gather(
+                *(self._search(client, semaphore, query) for query in queries)
+            )
+
+    def run_many(self, queries: List[str]) -> List[Dict]:
+        """Synchronous wrapper around search_many."""
+        return asyncio.run(self.search_many(queries))
+
+    def _run(self, queries: List[str]) -> str:
+        return json.dumps(self.run_many(queries), indent=2)
+
 class PodcastAudioGenerator(BaseTool):
     """Enhanced podcast audio generation tool."""
     
@@ -47,14 +121,19 @@ class PodcastAudioGenerator(BaseTool):
     voice_configs: Dict[str, Dict] = Field(default_factory=dict)
     audio_config: AudioConfig = Field(default_factory=AudioConfig)
     output_dir: str = Field(default="output/audio-files")
+    max_concurrency: int = 8  # ElevenLabs concurrent request limit
+    timeout: float = 60.0
     client: Any = Field(default=None)
+    semaphore: Any = Field(default=None)
+    cache_dir: Optional[str] = Field(default="outputs/.tts_cache")  # None disables caching
+    cache_size_limit: int = 2 * 1024 ** 3  # 2 GiB, least recently stored evicted first
+    segment_cache: Any = Field(default=None)
     args_schema: Type[BaseModel] = PodcastAudioGeneratorInput
 
     def __init__(self, **data):
         super().__init__(**data)
         if not self.api_key:
             raise ValueError("ELEVENLABS_API_KEY environment variable not set")
-        self.client = ElevenLabs(api_key=self.api_key)
 
     def add_voice(self, name: str, voice_id: str, config: Optional[VoiceConfig] = None) -> None:
         """Add a voice configuration."""
@@ -63,26 +142,106 @@ class PodcastAudioGenerator(BaseTool):
             "config": config or VoiceConfig()
         }
 
-    def _run(self, dialogue: List[Dialogue]) -> List[str]:
-        """Generate audio files for each script segment."""
+    @property
+    def cache(self) -> Optional[Cache]:
+        """Open the segment cache on first use; None when caching is disabled."""
+        if self.cache_dir and self.segment_cache is None:
+            self.segment_cache = Cache(self.cache_dir, size_limit=self.cache_size_limit)
+        return self.segment_cache
+
+    def cache_key(self, voice_config: Dict, text: str) -> str:
+        """Hash everything that affects the audio produced for a line."""
+        config = voice_config["config"]
+        parts = [
+            voice_config["voice_id"],
+            config.stability,
+            config.similarity_boost,
+            config.style,
+            config.use_speaker_boost,
+            config.model_id,
+            config.output_format,
+            self.audio_config.model_dump_json(),
+            text,
+        ]
+        return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+    @asynccontextmanager
+    async def session(self):
+        """Open an async ElevenLabs client on the shared connection pool."""
         os.makedirs(self.output_dir, exist_ok=True)
+        async with async_client() as http_client:
+            self.client = AsyncElevenLabs(
+                api_key=self.api_key,
+                httpx_client=http_client,
+                timeout=self.timeout
+            )
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+            try:
+                yield self
+            finally:
+                self.client = None
+                self.semaphore = None
 
-        audio_files = []
-        for index, segment in enumerate(dialogue):
-            speaker = segment.get('speaker', '').strip()
-            text = segment.get('text', '').strip()
-            
-            if not speaker or not text:
-                print(f"Skipping segment {index}: missing speaker or text")
-                continue
+    def _normalize(self, filename: str) -> None:
+        """Basic audio normalization."""
+        # Work on 16-bit mono at the processing rate to keep decoded audio small
+        audio = (
+            AudioSegment.from_file(filename)
+            .set_frame_rate(self.audio_config.processing_sample_rate)
+            .set_channels(self.audio_config.processing_channels)
+            .set_sample_width(2)
+        )
+        normalized = audio.normalize()  # Simple normalization
+        normalized = normalized + 4  # Slight boost
 
-            voice_config = self.voice_configs.get(speaker)
-            if not voice_config:
-                print(f"Skipping unknown speaker: {speaker}")
-                continue
+        # Use context manager to ensure file is closed
+        with normalized.export(
+            filename,
+            format=self.audio_config.format,
+            bitrate=self.audio_config.bitrate,
+            parameters=[
+                "-ar", str(self.audio_config.processing_sample_rate),
+                "-ac", str(self.audio_config.processing_channels)
+            ]
+        ) as f:
+            f.close()
 
-            try:
-                audio_generator = self.client.text_to_speech.convert(
+    def _write_segment(self, filename: str, audio_bytes: bytes) -> None:
+        """Write one segment's audio to disk."""
+        with open(filename, "wb") as out:
+            out.write(audio_bytes)
+
+    def _restore_cached(self, key: str, filename: str) -> bool:
+        """Write a cached segment to filename; False when it isn't cached."""
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is None:
+            return False
+        self._write_segment(filename, cached)
+        return True
+
+    def _store_cached(self, key: str, filename: str) -> None:
+        """Save a finished segment to the cache."""
+        if self.cache is not None:
+            with open(filename, "rb") as f:
+                self.cache.set(key, f.read())
+
+    async def synthesize_line(self, index: int, speaker: str, text: str) -> Optional[str]:
+        """Generate the audio file for one dialogue line inside a session."""
+        voice_config = self.voice_configs.get(speaker)
+        if not voice_config:
+            print(f"Skipping unknown speaker: {speaker}")
+            return None
+
+        filename = f"{self.output_dir}/{index:03d}_{speaker}.{self.audio_config.format}"
+        key = self.cache_key(voice_config, text)
+        # Disk cache and file I/O run off the event loop, like normalization
+        if await asyncio.to_thread(self._restore_cached, key, filename):
+            print(f'Audio content for segment {index} reused from cache')
+            return filename
+
+        try:
+            async with self.semaphore:
+                audio_stream = self.client.text_to_speech.convert(
                     text=text,
                     voice_id=voice_config["voice_id"],
                     model_id=voice_config['config'].model_id,
@@ -95,36 +254,51 @@ class PodcastAudioGenerator(BaseTool):
                     }
                 )
 
-                # Convert generator to bytes
-                audio_bytes = b''.join(chunk for chunk in audio_generator)
-
-                filename = f"{self.output_dir}/{index:03d}_{speaker}.{self.audio_config.format}"
-                with open(filename, "wb") as out:
-                    out.write(audio_bytes)
-
-                # Basic audio normalization
-                if self.audio_config.normalize:
-                    audio = AudioSegment.from_file(filename)
-                    normalized = audio.normalize()  # Simple normalization
-                    normalized = normalized + 4  # Slight boost
-                    
-                    # Use context manager to ensure file is closed
-                    with normalized.export(
-                        filename,
-                        format=self.audio_config.format,
-                        bitrate=self.audio_config.bitrate,
-                        parameters=["-ar", str(self.audio_config.sample_rate)]
-                    ) as f:
-                        f.close()
-
-                audio_files.append(filename)
-                print(f'Audio content written to file "{filename}"')
-
-            except Exception as e:
-                print(f"Error processing segment {index}: {str(e)}")
+                # Convert stream to bytes
+                audio_bytes = b''.join([chunk async for chunk in audio_stream])
+
+            await asyncio.to_thread(self._write_segment, filename, audio_bytes)
+
+            # Decode and re-encode off the event loop so other requests keep flowing
+            if self.audio_config.normalize:
+                await asyncio.to_thread(self._normalize, filename)
+
+            await asyncio.to_thread(self._store_cached, key, filename)
+
+            print(f'Audio content written to file "{filename}"')
+            return filename
+
+        except Exception as e:
+            print(f"Error processing segment {index}: {str(e)}")
+            return None
+
+    async def synthesize_all(self, dialogue: List[Any]) -> List[str]:
+        """Generate audio files for all dialogue lines concurrently."""
+        lines = []
+        for index, segment in enumerate(dialogue):
+            if isinstance(segment, BaseModel):
+                segment = segment.model_dump()
+            speaker = segment.get('speaker', '').strip()
+            text = segment.get('text', '').strip()
+
+            if not speaker or not text:
+                print(f"Skipping segment {index}: missing speaker or text")
                 continue
+            lines.append((index, speaker, text))
 
-        return sorted(audio_files)
+        # Submit lines grouped by speaker so consecutive requests share a voice
+        lines.sort(key=lambda line: (line[1], line[0]))
+
+        async with self.session():
+            audio_files = await asyncio.gather(
+                *(self.synthesize_line(index, speaker, text) for index, speaker, text in lines)
+            )
+
+        return sorted(filename for filename in audio_files if filename)
+
+    def _run(self, dialogue: List[Dialogue]) -> List[str]:
+        """Generate audio files for each script segment."""
+        return asyncio.run(self.synthesize_all(dialogue))
 
 class PodcastMixer(BaseTool):
     """Enhanced audio mixing tool for podcast production."""
@@ -135,10 +309,38 @@ class PodcastMixer(BaseTool):
     audio_config: AudioConfig = Field(default_factory=AudioConfig)
     output_dir: str = Field(default="output/podcast")
 
+    def _filter_graph(self, count: int, crossfade: int, pause: int) -> str:
+        """Build an FFmpeg filter graph that joins, crossfades, and levels all segments."""
+        # Mix as 16-bit audio at the processing rate; the encoder converts on export
+        sample_format = (
+            f"aformat=sample_fmts=s16:sample_rates={self.audio_config.processing_sample_rate}"
+            f":channel_layouts={'mono' if self.audio_config.processing_channels == 1 else 'stereo'}"
+        )
+
+        filters = []
+        for index in range(count):
+            chain = f"[{index}:a]{sample_format}"
+            if index > 0:
+                chain += f",adelay={pause}:all=1"  # Pause before each new line
+            filters.append(f"{chain}[s{index}]")
+
+        previous = "s0"
+        for index in range(1, count):
+            filters.append(f"[{previous}][s{index}]acrossfade=d={crossfade / 1000}[x{index}]")
+            previous = f"x{index}"
+
+        if self.audio_config.normalize:
+            # EBU R128 loudness normalization over the whole episode
+            filters.append(f"[{previous}]loudnorm=I={self.audio_config.target_loudness}:TP=-1.5:LRA=11[out]")
+        else:
+            filters.append(f"[{previous}]anull[out]")
+        return ";".join(filters)
+
     def _run(
         self,
         audio_files: List[str],
-        crossfade: int = 50
+        crossfade: int = 50,
+        pause: int = 200
     ) -> str:
         if not audio_files:
             raise ValueError("No audio files provided to mix")
@@ -146,30 +348,31 @@ class PodcastMixer(BaseTool):
         try:
             # Create output directory if it doesn't exist
             os.makedirs(self.output_dir, exist_ok=True)
-            
-            mixed = AudioSegment.from_file(audio_files[0])
-            for audio_file in audio_files[1:]:
-                next_segment = AudioSegment.from_file(audio_file)
-                # Add silence and use crossfade
-                silence = AudioSegment.silent(duration=200)
-                next_segment = silence + next_segment
-                mixed = mixed.append(next_segment, crossfade=crossfade)
 
             # Simplified output path handling
             output_file = os.path.join(self.output_dir, "podcast_final.mp3")
-            
-            mixed.export(
-                output_file,
-                format="mp3",
-                parameters=[
-                    "-q:a", "0",  # Highest quality
-                    "-ar", "48000"  # Professional sample rate
-                ]
-            )
+
+            # Decode, mix, level, and encode in a single FFmpeg pass
+            command = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+            for audio_file in audio_files:
+                command += ["-i", audio_file]
+            command += [
+                "-filter_complex", self._filter_graph(len(audio_files), crossfade, pause),
+                "-map", "[out]",
+                "-c:a", "libmp3lame",
+                "-b:a", self.audio_config.bitrate,
+                "-ar", str(self.audio_config.sample_rate),
+                "-ac", str(self.audio_config.channels),
+                output_file
+            ]
+            subprocess.run(command, check=True, capture_output=True, text=True)
 
             print(f"Successfully mixed podcast to: {output_file}")
             return output_file
 
+        except subprocess.CalledProcessError as e:
+            print(f"Error mixing podcast: {e.stderr.strip()}")
+            return ""
         except Exception as e:
             print(f"Error mixing podcast: {str(e)}")
-            return ""
\ No newline at end of file
+            return ""